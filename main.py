@@ -17,26 +17,81 @@ Version: 1.2 - Fixed subprocess call in JavaFinder
 import os
 import sys
 import json
+import functools
+import hashlib
+import importlib.util
+import operator
 import re
+import selectors
 import shlex
 import shutil
+import stat
 import subprocess
+import tempfile
 import threading
 import time
+import traceback
 import xml.etree.ElementTree as ET
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, field, fields
 from enum import Enum, auto
 from pathlib import Path
-from typing import List, Optional, Dict, Tuple, Set, Any
+from typing import List, Optional, Dict, Tuple, Set, Any, IO, Iterator, Callable
 
 # Third-party library dependency. Install with: pip install requests
-try:
-    import requests
-except ImportError:
+# 启动时只检查是否已安装；requests 本身在首次联网时才导入 (启动已有服务器无需联网)
+if importlib.util.find_spec("requests") is None:
     print("错误：'requests' 库未安装。请使用 'pip install requests' 命令进行安装。")
     sys.exit(1)
 
+# 可选依赖：lxml (C 实现，解析 maven-metadata.xml 更快)。未安装时回退到标准库。
+try:
+    import lxml.etree as LET
+except ImportError:
+    LET = None
+
+# 可选依赖：ijson (增量解析 JSON，Mojang 版本清单无需整体载入)。未安装时整体解析响应。
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# 可选依赖：orjson (C 加速的 JSON 解析)。未安装时使用标准库 json。
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _current_umask() -> int:
+    """读取进程的 umask (os.umask 只能在设置新值的同时返回旧值)"""
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+# 导入时读取一次 (此时尚未启动其他线程)，新文件权限与 open() 创建时一致
+_NEW_FILE_MODE = 0o666 & ~_current_umask()
+
+# dataclass(slots=True) 需要 Python 3.10+，旧版本上退化为普通 dataclass
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+_XML_PARSE_ERRORS: Tuple[type, ...] = (ET.ParseError,) + ((LET.XMLSyntaxError,) if LET is not None else ())
+_JSON_PARSE_ERRORS: Tuple[type, ...] = (json.JSONDecodeError,) + ((ijson.JSONError,) if ijson is not None else ())
+
+
+@functools.lru_cache(maxsize=None)
+def _network_errors() -> Tuple[type, ...]:
+    """网络请求可能抛出的异常 (首次调用时导入 requests)"""
+    import requests
+    from urllib3.exceptions import HTTPError as Urllib3HTTPError
+    return requests.RequestException, Urllib3HTTPError
+
+
+@functools.lru_cache(maxsize=None)
+def _fetch_errors() -> Tuple[type, ...]:
+    """网络请求及响应解析可能抛出的异常"""
+    return (*_network_errors(), *_JSON_PARSE_ERRORS, *_XML_PARSE_ERRORS)
+
 
 # ==============================================================================
 # 1. API 客户端模块 (Mojang, Forge, Fabric, NeoForge)
@@ -52,56 +107,240 @@ class AnsiColors:
     BOLD = "\033[1m"
 
 
+class ResponseCache:
+    """基于文件的 API 结果缓存，按 URL 存储在 ~/.cache/minecraft_server_management/ 下"""
+    CACHE_DIR = Path(os.environ.get('XDG_CACHE_HOME') or "~/.cache").expanduser() / "minecraft_server_management"
+
+    @staticmethod
+    def _path_for(url: str) -> Path:
+        return ResponseCache.CACHE_DIR / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    @staticmethod
+    def load(url: str, ttl: Optional[float]) -> Optional[Any]:
+        """读取缓存内容；ttl 为 None 时忽略过期时间 (用于网络失败时的回退)"""
+        try:
+            with open(ResponseCache._path_for(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            if ttl is not None and time.time() - entry["fetched_at"] > ttl:
+                return None
+            return entry["payload"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def store(url: str, payload: Any):
+        """写入缓存 (写临时文件后替换，避免留下半截文件)；写入失败时静默忽略"""
+        try:
+            entry = json.dumps({"url": url, "fetched_at": time.time(), "payload": payload}, default=str)
+            Utils.atomic_write_text(ResponseCache._path_for(url), entry)
+        except (OSError, TypeError, ValueError):
+            pass
+
+    @staticmethod
+    def invalidate(url: str):
+        try:
+            ResponseCache._path_for(url).unlink()
+        except OSError:
+            pass
+
+
+def cached(ttl: float) -> Callable[[Callable[[str], Any]], Callable[[str], Any]]:
+    """为 fetch(url) 添加磁盘缓存：TTL 内直接返回缓存；请求失败时回退到过期缓存"""
+    def decorator(fetch: Callable[[str], Any]) -> Callable[[str], Any]:
+        @functools.wraps(fetch)
+        def wrapper(url: str) -> Any:
+            payload = ResponseCache.load(url, ttl)
+            if payload is not None:
+                return payload
+            try:
+                payload = fetch(url)
+            except _fetch_errors() as e:
+                stale = ResponseCache.load(url, None)
+                if stale is None:
+                    raise
+                print(f"\n{AnsiColors.YELLOW}警告：请求 {url} 失败 ({e})，使用本地缓存的旧数据。{AnsiColors.RESET}")
+                return stale
+            ResponseCache.store(url, payload)
+            return payload
+        return wrapper
+    return decorator
+
+
+# 保护 ApiClients 共享会话的创建：首次联网可能同时发生在多个工作线程中
+_CLIENT_LOCK = threading.Lock()
+
+
 class ApiClients:
     """用于与各种 Minecraft 相关 API 通信的客户端"""
-    _CLIENT = requests.Session()
-    _CLIENT.headers.update({'User-Agent': 'MinecraftServerManager/1.2 (Python)'})
-    _OBJECT_MAPPER = json
+    _CLIENT: Optional['requests.Session'] = None
+
+    @staticmethod
+    def _client() -> 'requests.Session':
+        """共享的 HTTP 会话，首次联网时创建 (requests 导入耗时较多，避免拖慢启动)"""
+        client = ApiClients._CLIENT
+        if client is None:
+            with _CLIENT_LOCK:
+                client = ApiClients._CLIENT
+                if client is None:
+                    client = ApiClients._CLIENT = ApiClients._create_client()
+        return client
+
+    @staticmethod
+    def _create_client() -> 'requests.Session':
+        """创建带连接池和自动重试的 HTTP 会话"""
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util import make_headers
+        from urllib3.util.retry import Retry
+
+        client = requests.Session()
+        client.headers.update({
+            'User-Agent': 'MinecraftServerManager/1.2 (Python)',
+            # 声明本机 urllib3 能解码的全部压缩格式 (安装 brotli 时包含 br)
+            'Accept-Encoding': make_headers(accept_encoding=True)['accept-encoding'],
+        })
+        # 所有 API 请求与文件下载共享同一连接池 (HTTP keep-alive)，并对限流/服务端瞬时错误自动重试
+        client.mount('https://', HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)),
+        ))
+        return client
+
+    # 只使用 loads(bytes)，orjson 与 json 接口一致；orjson.JSONDecodeError 是 json.JSONDecodeError 的子类
+    _OBJECT_MAPPER = orjson if orjson is not None else json
+    # 解析循环中一次取出多个字段
+    _MC_VERSION_FIELDS = operator.itemgetter('id', 'type', 'url')
+    _FABRIC_LOADER_FIELDS = operator.itemgetter('version', 'stable')
 
     # --- Mojang API ---
-    @dataclass
+    @dataclass(frozen=True, **_SLOTS)
     class MinecraftVersion:
         id: str
         type: str
         url: str
 
+    _MANIFEST_URL = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
+
+    @staticmethod
+    @cached(ttl=600)
+    def _download_manifest(url: str) -> Dict[str, Any]:
+        """下载并解析 Mojang 版本清单"""
+        if ijson is None:
+            response = ApiClients._client().get(url, timeout=10)
+            response.raise_for_status()
+            return ApiClients._OBJECT_MAPPER.loads(response.content)
+        # 直接从响应流中逐条解析 versions 数组
+        with ApiClients._client().get(url, stream=True, timeout=10) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True
+            return {"versions": list(ijson.items(response.raw, "versions.item"))}
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _fetch_manifest() -> Dict[str, Any]:
+        """获取 Mojang 版本清单 (会话内缓存，失败时不缓存)"""
+        return ApiClients._download_manifest(ApiClients._MANIFEST_URL)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=1)
+    def _manifest_by_id() -> Dict[str, MinecraftVersion]:
+        """以版本 id 为键的清单索引，保持 API 返回的顺序 (与 _fetch_manifest 一同缓存)"""
+        get_fields = ApiClients._MC_VERSION_FIELDS
+        index: Dict[str, ApiClients.MinecraftVersion] = {}
+        for v_data in ApiClients._fetch_manifest().get("versions", []):
+            v_id, v_type, v_url = get_fields(v_data)
+            index[v_id] = ApiClients.MinecraftVersion(id=v_id, type=v_type, url=v_url)
+        return index
+
+    @staticmethod
+    def clear_manifest_cache():
+        """清除已缓存的版本清单 (包括磁盘缓存)，下次调用时重新下载"""
+        ApiClients._manifest_by_id.cache_clear()
+        ApiClients._fetch_manifest.cache_clear()
+        ResponseCache.invalidate(ApiClients._MANIFEST_URL)
+
+    @staticmethod
+    def _get_version_index() -> Dict[str, MinecraftVersion]:
+        """获取版本索引，失败时打印错误并返回空字典"""
+        try:
+            return ApiClients._manifest_by_id()
+        except (*_network_errors(), *_JSON_PARSE_ERRORS) as e:
+            print(f"\n{AnsiColors.RED}错误：获取 Minecraft 版本失败: {e}{AnsiColors.RESET}")
+            return {}
+
     @staticmethod
     def get_minecraft_versions(filter_type: str = "release") -> List[MinecraftVersion]:
         """从 Mojang API 获取 Minecraft 版本列表"""
-        url = "https://piston-meta.mojang.com/mc/game/version_manifest_v2.json"
-        versions = []
+        index = ApiClients._get_version_index()
+        return [v for v in index.values() if not filter_type or v.type == filter_type]
+
+    @staticmethod
+    def _fetch_server_url(version_id: str, version_url: str) -> Optional[str]:
+        """从单个版本的 JSON 中读取服务端下载链接"""
         try:
-            response = ApiClients._CLIENT.get(url, timeout=10)
+            response = ApiClients._client().get(version_url, timeout=10)
             response.raise_for_status()
-            data = response.json()
-            for v_data in data.get("versions", []):
-                if not filter_type or v_data.get("type") == filter_type:
-                    versions.append(ApiClients.MinecraftVersion(
-                        id=v_data['id'], type=v_data['type'], url=v_data['url']
-                    ))
-            return versions
-        except requests.RequestException as e:
-            print(f"\n{AnsiColors.RED}错误：获取 Minecraft 版本失败: {e}{AnsiColors.RESET}")
-            return []
+            data = ApiClients._OBJECT_MAPPER.loads(response.content)
+            return data.get("downloads", {}).get("server", {}).get("url")
+        except (*_network_errors(), json.JSONDecodeError) as e:
+            print(f"\n{AnsiColors.RED}错误：获取 {version_id} 的下载链接失败: {e}{AnsiColors.RESET}")
+            return None
 
     @staticmethod
     def get_minecraft_download_url(version_id: str) -> Optional[str]:
         """获取特定 Minecraft 版本的服务端下载链接"""
-        all_versions = ApiClients.get_minecraft_versions(filter_type="")
-        version_url = next((v.url for v in all_versions if v.id == version_id), None)
-        if not version_url:
+        entry = ApiClients._get_version_index().get(version_id)
+        if not entry:
             return None
-        try:
-            response = ApiClients._CLIENT.get(version_url, timeout=10)
+        return ApiClients._fetch_server_url(version_id, entry.url)
+
+    @staticmethod
+    def get_download_urls(version_ids: List[str]) -> Dict[str, Optional[str]]:
+        """并行获取多个 Minecraft 版本的服务端下载链接"""
+        index = ApiClients._get_version_index()
+        results: Dict[str, Optional[str]] = {v_id: None for v_id in version_ids}
+        to_fetch = [v_id for v_id in version_ids if v_id in index]
+        if not to_fetch:
+            return results
+        with ThreadPoolExecutor(max_workers=min(8, len(to_fetch))) as executor:
+            futures = {
+                executor.submit(ApiClients._fetch_server_url, v_id, index[v_id].url): v_id
+                for v_id in to_fetch
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    @staticmethod
+    def _iter_maven_versions(source: IO[bytes]) -> Iterator[str]:
+        """流式解析 maven-metadata.xml，逐个产出 <version> 节点的文本"""
+        if LET is not None:
+            for _, elem in LET.iterparse(source, events=("end",), tag="version"):
+                if elem.text:
+                    yield elem.text
+                # 释放已处理的节点，避免构建完整的树
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+        else:
+            for _, elem in ET.iterparse(source, events=("end",)):
+                if elem.tag == "version":
+                    if elem.text:
+                        yield elem.text
+                    elem.clear()
+
+    @staticmethod
+    @cached(ttl=3600)
+    def _fetch_maven_versions(url: str) -> List[str]:
+        """边下载边解析 maven-metadata.xml，只保留版本号列表"""
+        with ApiClients._client().get(url, stream=True, timeout=15) as response:
             response.raise_for_status()
-            data = response.json()
-            return data.get("downloads", {}).get("server", {}).get("url")
-        except (requests.RequestException, json.JSONDecodeError) as e:
-            print(f"\n{AnsiColors.RED}错误：获取 {version_id} 的下载链接失败: {e}{AnsiColors.RESET}")
-            return None
+            response.raw.decode_content = True
+            return list(ApiClients._iter_maven_versions(response.raw))
 
     # --- Forge API ---
-    @dataclass
+    @dataclass(frozen=True, **_SLOTS)
     class ForgeVersion:
         full_version: str
         mc_version: str
@@ -116,12 +355,8 @@ class ApiClients:
         url = "https://maven.minecraftforge.net/net/minecraftforge/forge/maven-metadata.xml"
         versions = []
         try:
-            response = ApiClients._CLIENT.get(url, timeout=15)
-            response.raise_for_status()
-            root = ET.fromstring(response.content)
-            for version_node in root.findall(".//version"):
-                full_version = version_node.text
-                if full_version and full_version.startswith(f"{mc_version}-"):
+            for full_version in ApiClients._fetch_maven_versions(url):
+                if full_version.startswith(f"{mc_version}-"):
                     parts = full_version.split('-', 1)
                     if len(parts) == 2:
                         versions.append(ApiClients.ForgeVersion(
@@ -129,37 +364,40 @@ class ApiClients:
                             mc_version=parts[0],
                             forge_version=parts[1]
                         ))
-            return sorted(versions, key=lambda v: v.forge_version, reverse=True)
-        except (requests.RequestException, ET.ParseError) as e:
+            return sorted(versions, key=lambda v: Utils.version_key(v.forge_version), reverse=True)
+        except (*_network_errors(), *_XML_PARSE_ERRORS) as e:
             print(f"\n{AnsiColors.RED}错误：获取 Forge 版本失败: {e}{AnsiColors.RESET}")
             return []
 
     # --- Fabric API ---
-    @dataclass
+    @dataclass(frozen=True, **_SLOTS)
     class FabricLoaderVersion:
         version: str
         stable: bool
 
+    @staticmethod
+    @cached(ttl=3600)
+    def _fetch_fabric_loaders(url: str) -> List[Dict[str, Any]]:
+        """下载 Fabric 加载器列表，只保留每项中的 loader 信息"""
+        response = ApiClients._client().get(url, timeout=10)
+        if response.status_code == 404: # 无版本可用
+            return []
+        response.raise_for_status()
+        data = ApiClients._OBJECT_MAPPER.loads(response.content)
+        return [item["loader"] for item in data if item.get("loader")]
+
     @staticmethod
     def get_fabric_loader_versions(mc_version: str) -> List[FabricLoaderVersion]:
         """从 Fabric Meta API 获取 Fabric 加载器版本"""
         url = f"https://meta.fabricmc.net/v2/versions/loader/{mc_version}"
         versions = []
         try:
-            response = ApiClients._CLIENT.get(url, timeout=10)
-            if response.status_code == 404: # 无版本可用
-                 return []
-            response.raise_for_status()
-            data = response.json()
-            for item in data:
-                loader_data = item.get("loader")
-                if loader_data:
-                    versions.append(ApiClients.FabricLoaderVersion(
-                        version=loader_data['version'],
-                        stable=loader_data['stable']
-                    ))
+            get_fields = ApiClients._FABRIC_LOADER_FIELDS
+            for loader_data in ApiClients._fetch_fabric_loaders(url):
+                version, stable = get_fields(loader_data)
+                versions.append(ApiClients.FabricLoaderVersion(version=version, stable=stable))
             return versions
-        except (requests.RequestException, json.JSONDecodeError) as e:
+        except (*_network_errors(), json.JSONDecodeError) as e:
             print(f"\n{AnsiColors.RED}错误：获取 Fabric 加载器版本失败: {e}{AnsiColors.RESET}")
             return []
 
@@ -168,18 +406,18 @@ class ApiClients:
         """获取最新的 Fabric 安装程序下载链接"""
         url = "https://meta.fabricmc.net/v2/versions/installer"
         try:
-            response = ApiClients._CLIENT.get(url, timeout=10)
+            response = ApiClients._client().get(url, timeout=10)
             response.raise_for_status()
-            data = response.json()
+            data = ApiClients._OBJECT_MAPPER.loads(response.content)
             if data and isinstance(data, list):
                 return data[0].get("url")
             return None
-        except (requests.RequestException, json.JSONDecodeError) as e:
+        except (*_network_errors(), json.JSONDecodeError) as e:
             print(f"\n{AnsiColors.RED}错误：获取 Fabric 安装程序链接失败: {e}{AnsiColors.RESET}")
             return None
 
     # --- NeoForge API ---
-    @dataclass
+    @dataclass(frozen=True, **_SLOTS)
     class NeoForgeVersion:
         full_version: str
         mc_version: str
@@ -199,19 +437,15 @@ class ApiClients:
         url = "https://maven.neoforged.net/releases/net/neoforged/neoforge/maven-metadata.xml"
         versions = []
         try:
-            response = ApiClients._CLIENT.get(url, timeout=15)
-            response.raise_for_status()
-            root = ET.fromstring(response.content)
-            for version_node in root.findall(".//version"):
-                full_version = version_node.text
-                if full_version and full_version.startswith(f"{mc_major_prefix}."):
+            for full_version in ApiClients._fetch_maven_versions(url):
+                if full_version.startswith(f"{mc_major_prefix}."):
                     versions.append(ApiClients.NeoForgeVersion(
                         full_version=full_version,
                         mc_version=f"1.{full_version.split('.')[0]}",
                         neoforge_version=full_version
                     ))
-            return sorted(versions, key=lambda v: v.full_version, reverse=True)
-        except (requests.RequestException, ET.ParseError) as e:
+            return sorted(versions, key=lambda v: Utils.version_key(v.full_version), reverse=True)
+        except (*_network_errors(), *_XML_PARSE_ERRORS) as e:
             print(f"\n{AnsiColors.RED}错误：获取 NeoForge 版本失败: {e}{AnsiColors.RESET}")
             return []
 
@@ -219,7 +453,7 @@ class ApiClients:
 # ==============================================================================
 # 2. Java 查找器模块
 # ==============================================================================
-@dataclass
+@dataclass(**_SLOTS)
 class JavaInstallation:
     """描述一个找到的 Java 安装"""
     java_home: Path
@@ -229,59 +463,137 @@ class JavaInstallation:
     major_version: int
     display_alias: str
     path_depth: int
+    # 菜单中显示的完整描述，创建时计算一次
+    display: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.display = f"{self.display_alias} - {self.java_home} (v: {self.version}, {self.vendor})"
 
     def __str__(self):
-        return f"{self.display_alias} - {self.java_home} (v: {self.version}, {self.vendor})"
+        return self.display
 
 
 class JavaFinder:
     """在系统上定位 Java 安装"""
+    CACHE_FILE = ResponseCache.CACHE_DIR / "java.json"
+    # 缓存键只能发现目录增删，原地升级等变化靠过期时间兜底
+    CACHE_TTL = 24 * 3600
+    # JDK 内部与 bin/java 无关的目录，遍历时直接跳过
+    _SKIP_DIRS = frozenset({'lib', 'legal', 'conf', 'include', 'jmods', 'man', 'src.zip'})
+    # 'java -version' 输出解析用的正则 (预编译，跨线程共享)
+    _VERSION_RE = re.compile(r'version "([^"]+)"', re.IGNORECASE)
+    _DIGITS_RE = re.compile(r'\d+')
+    # 供应商关键字，分组序号即优先级 (序号越小越优先)
+    _VENDOR_RE = re.compile(r'(zulu)|(temurin)|(graalvm)|(oracle corporation)|(java\(tm\) se)|(openjdk)', re.IGNORECASE)
+    _VENDOR_NAMES = (None, "Zulu", "Eclipse Temurin", "GraalVM", "Oracle", "Oracle", "OpenJDK")
 
     @staticmethod
-    def get_java_details(java_exe: Path) -> Optional[JavaInstallation]:
-        """运行 'java -version' 并解析其输出"""
+    def _bounded_find_java(root: Path, max_depth: int = 4) -> Iterator[Path]:
+        """在 root 下查找 bin/java，最多下探 max_depth 层且不跟随目录符号链接"""
+        def walk(dir_path: str, depth: int) -> Iterator[Path]:
+            try:
+                with os.scandir(dir_path) as it:
+                    entries = list(it)
+            except OSError:
+                return
+            for entry in entries:
+                if entry.name in JavaFinder._SKIP_DIRS:
+                    continue
+                try:
+                    if not entry.is_dir(follow_symlinks=False):
+                        continue
+                except OSError:
+                    continue
+                if entry.name == 'bin':
+                    java_exe = os.path.join(entry.path, 'java')
+                    if os.path.lexists(java_exe):
+                        yield Path(java_exe)
+                elif depth < max_depth:
+                    yield from walk(entry.path, depth + 1)
+
+        yield from walk(str(root), 1)
+
+    @staticmethod
+    def _parse_major_version(version_str: str) -> int:
+        """从版本字符串解析主版本号 ("1.8.0_392" -> 8, "17.0.2" -> 17)"""
+        version_parts = JavaFinder._DIGITS_RE.findall(version_str)
+        if not version_parts:
+            return 0
+        if version_parts[0] == '1':
+            return int(version_parts[1]) if len(version_parts) > 1 else 8
+        return int(version_parts[0])
+
+    @staticmethod
+    def _parse_release_file(java_home: Path) -> Optional[Tuple[str, str]]:
+        """读取 JAVA_HOME/release 文件 (JDK/JRE 9+ 自带)，返回 (版本, 供应商)；无法确定时返回 None"""
         try:
-            # *** FIX v1.2: Corrected subprocess call to avoid ValueError ***
-            # Removed capture_output=True as it conflicts with stderr argument.
-            # Explicitly capture stdout and redirect stderr to stdout.
-            result = subprocess.run(
-                [str(java_exe), "-version"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                timeout=5
-            )
-            output = result.stdout
+            content = (java_home / "release").read_text(encoding='utf-8', errors='replace')
+        except OSError:
+            return None
 
-            # 解析版本
-            version_match = re.search(r'version "([^"]+)"', output)
-            if not version_match:
-                version_match = re.search(r'(?:openjdk|java) version "([^"]+)"', output, re.IGNORECASE)
-                if not version_match: return None
-            
-            version_str = version_match.group(1)
-            
-            # 解析主版本号
-            major_version = 0
-            version_parts = re.findall(r'\d+', version_str)
-            if version_parts:
-                if version_parts[0] == '1':
-                    major_version = int(version_parts[1]) if len(version_parts) > 1 else 8
-                else:
-                    major_version = int(version_parts[0])
-
-            # 解析供应商
-            vendor = "Unknown"
-            output_lower = output.lower()
-            if "zulu" in output_lower: vendor = "Zulu"
-            elif "temurin" in output_lower: vendor = "Eclipse Temurin"
-            elif "graalvm" in output_lower: vendor = "GraalVM"
-            elif "oracle corporation" in output_lower or ("java(tm) se" in output_lower and "openjdk" not in output_lower): vendor = "Oracle"
-            elif "openjdk" in output_lower: vendor = "OpenJDK"
-            
+        props: Dict[str, str] = {}
+        for line in content.splitlines():
+            key, sep, value = line.partition('=')
+            if sep:
+                props[key.strip()] = value.strip().strip('"')
+
+        version_str = props.get("JAVA_VERSION")
+        implementor = props.get("IMPLEMENTOR")
+        # Oracle 同时发布 Oracle JDK 与 OpenJDK 构建，仅凭 release 文件无法区分，交给 'java -version'
+        if not version_str or not implementor or implementor == "Oracle Corporation":
+            return None
+
+        vendor_text = f"{implementor} {props.get('IMPLEMENTOR_VERSION', '')}".lower()
+        if "zulu" in vendor_text or "azul" in vendor_text: vendor = "Zulu"
+        elif "temurin" in vendor_text or "adoptium" in vendor_text: vendor = "Eclipse Temurin"
+        elif "graalvm" in vendor_text: vendor = "GraalVM"
+        else: vendor = "OpenJDK"
+        return version_str, vendor
+
+    @staticmethod
+    def _parse_version_output(java_exe: Path) -> Optional[Tuple[str, str]]:
+        """运行 'java -version' 并解析其输出，返回 (版本, 供应商)"""
+        # *** FIX v1.2: Corrected subprocess call to avoid ValueError ***
+        # Removed capture_output=True as it conflicts with stderr argument.
+        # Explicitly capture stdout and redirect stderr to stdout.
+        result = subprocess.run(
+            [str(java_exe), "-version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            timeout=5
+        )
+        output = result.stdout
+
+        # 解析版本
+        version_match = JavaFinder._VERSION_RE.search(output)
+        if not version_match: return None
+
+        # 解析供应商
+        vendor = "Unknown"
+        vendor_hits = {m.lastindex for m in JavaFinder._VENDOR_RE.finditer(output)}
+        if vendor_hits:
+            best = min(vendor_hits)
+            # 仅凭 "Java(TM) SE" 判定为 Oracle 时，需确认输出中没有 OpenJDK
+            if best == 5 and 6 in vendor_hits:
+                best = 6
+            vendor = JavaFinder._VENDOR_NAMES[best]
+        return version_match.group(1), vendor
+
+    @staticmethod
+    def get_java_details(java_exe: Path) -> Optional[JavaInstallation]:
+        """获取 Java 安装的详细信息：优先读取 release 文件，必要时运行 'java -version'"""
+        try:
             # 使用真实路径来确定 JAVA_HOME
             real_java_exe = java_exe.resolve()
             java_home = real_java_exe.parent.parent
+
+            details = JavaFinder._parse_release_file(java_home) or JavaFinder._parse_version_output(java_exe)
+            if not details:
+                return None
+            version_str, vendor = details
+            major_version = JavaFinder._parse_major_version(version_str)
+
             java_type = "JDK" if (java_home / "bin" / "javac").exists() else "JRE"
             
             sanitized_vendor = vendor.lower().replace(" ", "").replace("eclipse", "")
@@ -299,6 +611,88 @@ class JavaFinder:
         except (subprocess.CalledProcessError, subprocess.TimeoutExpired, FileNotFoundError):
             return None
 
+    @staticmethod
+    def _is_executable_file(path: Path) -> bool:
+        """用一次 stat 判断路径是否为可执行的普通文件"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return stat.S_ISREG(st.st_mode) and bool(st.st_mode & 0o111)
+
+    @staticmethod
+    def _probe_candidate(java_exe: Path) -> Optional[JavaInstallation]:
+        """检查候选是否为可执行文件，然后获取其详细信息 (在工作线程中运行)"""
+        if not JavaFinder._is_executable_file(java_exe):
+            return None
+        try:
+            return JavaFinder.get_java_details(java_exe)
+        except OSError:
+            return None
+
+    @staticmethod
+    def _cache_key(search_paths: List[str]) -> str:
+        """由搜索根目录及其直接子目录的修改时间、JAVA_HOME 和 PATH 中的 java 计算缓存键"""
+        state: List[Any] = []
+        for root in search_paths:
+            try:
+                state.append([root, os.stat(root).st_mtime_ns])
+            except OSError:
+                state.append([root, None])
+                continue
+            # 新 JDK 常装在已有子目录下 (如 /opt/java/openjdk)，根目录的修改时间不会变化
+            children: List[Any] = []
+            try:
+                with os.scandir(root) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                children.append([entry.path, entry.stat().st_mtime_ns])
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+            state.extend(sorted(children))
+        java_in_path = shutil.which('java')
+        state.append(os.environ.get('JAVA_HOME'))
+        state.append(os.path.realpath(java_in_path) if java_in_path else None)
+        return hashlib.sha1(json.dumps(state).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def load_cached_installations(search_paths: List[str]) -> Optional[List[JavaInstallation]]:
+        """读取上次的搜索结果；搜索环境有变化或缓存中的 Java 已失效时返回 None"""
+        try:
+            data = json.loads(JavaFinder.CACHE_FILE.read_text(encoding='utf-8'))
+            if time.time() - data["saved_at"] > JavaFinder.CACHE_TTL:
+                return None
+            if data["key"] != JavaFinder._cache_key(search_paths):
+                return None
+            installations = [
+                JavaInstallation(**{**item, "java_home": Path(item["java_home"])})
+                for item in data["installations"]
+            ]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        if not all(JavaFinder._is_executable_file(inst.java_home / "bin" / "java") for inst in installations):
+            return None
+        return installations
+
+    @staticmethod
+    def save_cached_installations(search_paths: List[str], installations: List[JavaInstallation]):
+        """保存搜索结果供下次启动使用；写入失败时静默忽略"""
+        data = {
+            "key": JavaFinder._cache_key(search_paths),
+            "saved_at": time.time(),
+            "installations": [
+                {**{f.name: getattr(inst, f.name) for f in fields(inst) if f.init}, "java_home": str(inst.java_home)}
+                for inst in installations
+            ],
+        }
+        try:
+            Utils.atomic_write_text(JavaFinder.CACHE_FILE, json.dumps(data, indent=2))
+        except OSError:
+            pass
+
     @staticmethod
     def find_java_installations(search_paths: List[str]) -> List[JavaInstallation]:
         """在系统上定位 Java 安装 (已改进)"""
@@ -318,27 +712,30 @@ class JavaFinder:
             search_path = Path(search_path_str).expanduser()
             if not search_path.is_dir():
                 continue
-            for java_exe in search_path.rglob('bin/java'):
-                if os.access(java_exe, os.X_OK):
+            for java_exe in JavaFinder._bounded_find_java(search_path):
+                if JavaFinder._is_executable_file(java_exe):
                     candidate_exes.add(java_exe)
 
-        # 3. 处理所有找到的唯一候选
-        for java_exe_candidate in candidate_exes:
-            try:
-                if not java_exe_candidate.is_file() or not os.access(java_exe_candidate, os.X_OK):
+        # 3. 按真实路径去重 (/usr/bin/java、alternatives 等符号链接常指向同一文件)
+        unique_exes = list({os.path.realpath(p): p for p in candidate_exes}.values())
+
+        # 4. 并行处理所有找到的唯一候选 (每个候选都可能需要启动一次 java 子进程)
+        if not unique_exes:
+            return []
+        with ThreadPoolExecutor(max_workers=min(16, len(unique_exes))) as executor:
+            futures = {executor.submit(JavaFinder._probe_candidate, p): p for p in unique_exes}
+            # 去重在主线程中完成，无需加锁
+            for future in as_completed(futures):
+                details = future.result()
+                if not details:
+                    continue
+                if details.java_home in processed_homes:
                     continue
+                processed_homes.add(details.java_home)
 
-                details = JavaFinder.get_java_details(java_exe_candidate)
-                if details:
-                    if details.java_home in processed_homes:
-                        continue
-                    processed_homes.add(details.java_home)
-                    
-                    if details.display_alias not in found_installations or \
-                       details.path_depth < found_installations[details.display_alias].path_depth:
-                        found_installations[details.display_alias] = details
-            except (OSError):
-                continue
+                if details.display_alias not in found_installations or \
+                   details.path_depth < found_installations[details.display_alias].path_depth:
+                    found_installations[details.display_alias] = details
 
         # 按主版本号降序排序
         return sorted(list(found_installations.values()), key=lambda x: x.major_version, reverse=True)
@@ -349,6 +746,43 @@ class JavaFinder:
 class Utils:
     """提供用户界面和通用功能的辅助类"""
 
+    _DIGITS_RE = re.compile(r'\d+')
+
+    @staticmethod
+    def version_key(version: str) -> Tuple[int, ...]:
+        """将点分版本号转换为整数元组，用于按数值排序 ("14.23.10" > "14.23.5")"""
+        return tuple(int(p) for p in Utils._DIGITS_RE.findall(version))
+
+    @staticmethod
+    def atomic_write_text(path: Path, text: str) -> bool:
+        """原子地写入文本文件 (临时文件 + os.replace)；内容未变化时不写入，返回是否写入"""
+        data = text.encode('utf-8')
+        mode = _NEW_FILE_MODE
+        try:
+            if path.read_bytes() == data:
+                return False
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except OSError:
+            pass
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            # mkstemp 创建的文件权限为 0600，保持与原文件一致；新文件遵循 umask
+            os.fchmod(fd, mode)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+        return True
+
     @staticmethod
     def colorize(text: str, color: str) -> str:
         """为文本添加颜色"""
@@ -371,19 +805,52 @@ class Utils:
         sys.stdout.write("\r\033[K")
         sys.stdout.flush()
 
+    @staticmethod
+    def relay_output(stream: IO[bytes]):
+        """将子进程的输出按块原样转发到终端，直到 EOF (不做逐行读取和解码)"""
+        fd = stream.fileno()
+        out = sys.stdout.buffer
+        sys.stdout.flush()
+        while True:
+            data = os.read(fd, 1 << 16)
+            if not data:
+                break
+            out.write(data)
+            out.flush()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def _progress_bar(percent: int) -> str:
+        done = percent // 2
+        return f"\r[{'=' * done}{' ' * (50-done)}] {percent:3d}%"
+
+    @staticmethod
+    def print_progress(downloaded: int, total: int, last_percent: int = -1) -> int:
+        """在同一行绘制下载进度条，返回当前百分比；与 last_percent 相同时不重绘"""
+        if total <= 0:
+            return last_percent
+        percent = min(100, downloaded * 100 // total)
+        if percent != last_percent:
+            sys.stdout.write(Utils._progress_bar(percent))
+            sys.stdout.flush()
+        return percent
+
     @staticmethod
     def show_menu(title: str, prompt: str, items: List[str]) -> int:
         """显示一个菜单并返回用户的选择（基于1的索引）"""
         if not items:
             return -1
-        print(f"\n{Utils.colorize(f'====== {title} ======', AnsiColors.YELLOW)}")
-        for i, item in enumerate(items, 1):
-            print(Utils.colorize(f"{i}. {item}", AnsiColors.CYAN))
-        print(Utils.colorize("----------------------------------------", AnsiColors.YELLOW))
-        
+        # 整个菜单拼接后一次性输出，减少慢速终端上的写入次数
+        header = Utils.colorize(f'====== {title} ======', AnsiColors.YELLOW)
+        body = "\n".join(Utils.colorize(f"{i}. {item}", AnsiColors.CYAN) for i, item in enumerate(items, 1))
+        footer = Utils.colorize("----------------------------------------", AnsiColors.YELLOW)
+        sys.stdout.write(f"\n{header}\n{body}\n{footer}\n")
+        sys.stdout.flush()
+
+        input_prompt = f"{Utils.colorize(prompt, AnsiColors.GREEN)} (输入 'q' 退出): "
         while True:
             try:
-                choice_str = input(f"{Utils.colorize(prompt, AnsiColors.GREEN)} (输入 'q' 退出): ").strip().lower()
+                choice_str = input(input_prompt).strip().lower()
                 if choice_str in ['q', 'quit']:
                     return -1
                 choice = int(choice_str)
@@ -419,12 +886,45 @@ class ServerType(Enum):
     FABRIC = auto()
     NEOFORGE = auto()
 
+@dataclass(**_SLOTS)
+class DownloadProgress:
+    """下载线程更新、界面线程读取的下载进度 (字节)"""
+    downloaded: int = 0
+    total: int = 0
+    # 分段下载失败并改用单连接时记录原因，由等待下载的界面线程提示用户
+    fallback_reason: Optional[str] = None
+
+@dataclass
+class PendingDownload:
+    """一个在后台进行中的下载"""
+    url: str
+    staging_file: Path
+    future: Future
+    cancel_event: threading.Event
+    progress: DownloadProgress
+
+    def cancel(self):
+        """中止下载，并在后台任务结束后删除临时文件"""
+        self.cancel_event.set()
+        self.future.cancel()
+        self.future.add_done_callback(lambda _f: self.staging_file.unlink(missing_ok=True))
+
+
 class MinecraftManager:
     """主应用程序类，包含所有业务逻辑"""
     MINECRAFT_SERVER_BASE_DIR = Path("minecraft_server")
+    LAUNCH_CACHE_NAME = ".mcm_cmd.json"
+    JAVA_SEARCH_PATHS = ["/usr/lib/jvm", os.path.expanduser("~/.sdkman/candidates/java"), "/opt"]
+    DOWNLOAD_CHUNK_SIZE = 1 << 20
+    DOWNLOAD_CONNECTIONS = 4
+    PARALLEL_DOWNLOAD_MIN_SIZE = 8 << 20  # 小文件直接单连接下载
+    # 目录名格式: <mc_version>-<type>-<mod_version>
+    _SERVER_TYPE_RE = re.compile(r"-(forge|fabric|neoforge)-", re.IGNORECASE)
+    _SERVER_TYPE_MAP = {"forge": ServerType.FORGE, "fabric": ServerType.FABRIC, "neoforge": ServerType.NEOFORGE}
 
     def __init__(self):
-        self.executor = ThreadPoolExecutor(max_workers=5)
+        # Java 搜索与三个版本列表请求会同时进行 (分段下载使用独立的线程池)
+        self.executor = ThreadPoolExecutor(max_workers=max(5, os.cpu_count() or 4), thread_name_prefix="mcm")
 
     def run(self):
         """脚本主入口点"""
@@ -432,8 +932,13 @@ class MinecraftManager:
             Utils.print_color("====== Minecraft 服务器管理脚本 (Python 版) ======", AnsiColors.YELLOW)
             self._check_os()
             
-            # 并行查找 Java
-            java_search_future = self.executor.submit(self._find_and_sort_java)
+            # 并行查找 Java (搜索环境未变化时直接使用上次的结果)
+            cached_java = JavaFinder.load_cached_installations(self.JAVA_SEARCH_PATHS)
+            if cached_java is not None:
+                java_search_future: Future = Future()
+                java_search_future.set_result(cached_java)
+            else:
+                java_search_future = self.executor.submit(self._find_and_sort_java)
             
             installed_versions = self._get_installed_versions()
             server_to_start: Optional[Path] = None
@@ -485,7 +990,6 @@ class MinecraftManager:
             Utils.print_color("\n\n操作被用户中断。正在退出...", AnsiColors.YELLOW)
         except Exception as e:
             Utils.print_color(f"\n程序运行出现严重错误: {e}", AnsiColors.RED)
-            import traceback
             traceback.print_exc()
         finally:
             self.executor.shutdown(wait=False, cancel_futures=True)
@@ -499,21 +1003,24 @@ class MinecraftManager:
 
     def _find_and_sort_java(self) -> List[JavaInstallation]:
         Utils.print_on_same_line("正在搜索 Java 环境...")
-        common_paths = ["/usr/lib/jvm", os.path.expanduser("~/.sdkman/candidates/java"), "/opt"]
-        installations = JavaFinder.find_java_installations(common_paths)
+        installations = JavaFinder.find_java_installations(self.JAVA_SEARCH_PATHS)
+        JavaFinder.save_cached_installations(self.JAVA_SEARCH_PATHS, installations)
         Utils.clear_line()
         return installations
 
     def _get_installed_versions(self) -> Dict[str, Path]:
         """获取已安装的服务器版本"""
         installed = {}
-        if not self.MINECRAFT_SERVER_BASE_DIR.is_dir():
+        try:
+            with os.scandir(self.MINECRAFT_SERVER_BASE_DIR) as it:
+                for entry in it:
+                    # DirEntry.is_dir 直接使用 readdir 返回的类型信息 (仅符号链接需要额外 stat)
+                    if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "eula.txt")):
+                        installed[entry.name] = Path(entry.path)
+        except OSError:
             return {}
-        for version_dir in self.MINECRAFT_SERVER_BASE_DIR.iterdir():
-            if version_dir.is_dir() and (version_dir / "eula.txt").exists():
-                installed[version_dir.name] = version_dir
-        
-        return dict(sorted(installed.items(), key=lambda item: item[0], reverse=True))
+
+        return dict(sorted(installed.items(), key=lambda item: Utils.version_key(item[0]), reverse=True))
 
     def _select_existing_server(self, installed_versions: Dict[str, Path]) -> Optional[Path]:
         Utils.print_color("\n--- 启动已有服务器 ---", f"{AnsiColors.BOLD}{AnsiColors.YELLOW}")
@@ -551,20 +1058,29 @@ class MinecraftManager:
         # 4. 确定目录名和路径
         server_dir_name = self._get_server_dir_name(server_type, mc_version, mod_version)
         server_dir = self.MINECRAFT_SERVER_BASE_DIR / server_dir_name
-        
-        if server_dir.exists():
-            overwrite = Utils.prompt_yes_no(f"目录 {server_dir_name} 已存在。是否覆盖安装?")
-            if overwrite is None or not overwrite: # 取消或选择否
-                return None
-            if overwrite:
-                 shutil.rmtree(server_dir)
 
-        # 5. 选择 Java
-        java_path = self._select_java_for_version(mc_version, server_dir, java_future)
-        if not java_path: return None
+        # 5. 在用户回答后续问题的同时后台下载
+        download = self._start_prefetch(server_type, mc_version, mod_version, server_dir_name)
+        try:
+            if server_dir.exists():
+                overwrite = Utils.prompt_yes_no(f"目录 {server_dir_name} 已存在。是否覆盖安装?")
+                if overwrite is None or not overwrite: # 取消或选择否
+                    download.cancel()
+                    return None
+                if overwrite:
+                     shutil.rmtree(server_dir)
+
+            # 6. 选择 Java
+            java_path = self._select_java_for_version(mc_version, server_dir, java_future)
+            if not java_path:
+                download.cancel()
+                return None
+        except BaseException:
+            download.cancel()
+            raise
 
-        # 6. 执行安装
-        self._install_server_core(server_type, mc_version, mod_version, server_dir, java_path)
+        # 7. 执行安装
+        self._install_server_core(server_type, mc_version, mod_version, server_dir, java_path, download)
         self._accept_eula(server_dir / "eula.txt")
         
         return server_dir, java_path
@@ -579,13 +1095,17 @@ class MinecraftManager:
             parts = v_id.split('.')
             return f"{parts[0]}.{parts[1]}" if len(parts) > 1 else v_id
         
-        major_series: List[str] = sorted(list(set(get_major_minor(v.id) for v in all_versions)), reverse=True)
+        # 一次遍历按主要版本系列分组 (组内保持 API 返回的顺序)
+        series_groups: Dict[str, List[str]] = {}
+        for v in all_versions:
+            series_groups.setdefault(get_major_minor(v.id), []).append(v.id)
+        major_series: List[str] = sorted(series_groups, key=Utils.version_key, reverse=True)
         
         choice = Utils.show_menu("选择 Minecraft 主要版本系列", "请选择版本系列：", major_series)
         if choice == -1: return None
         selected_series = major_series[choice - 1]
         
-        specific_versions = [v.id for v in all_versions if get_major_minor(v.id) == selected_series]
+        specific_versions = series_groups[selected_series]
         
         choice = Utils.show_menu("选择 Minecraft 具体版本", "请选择服务端版本：", specific_versions)
         if choice == -1: return None
@@ -595,13 +1115,15 @@ class MinecraftManager:
     def _prompt_for_server_type(self, mc_version, forge_future, fabric_future, neoforge_future) -> Optional[ServerType]:
         """提示用户选择服务端类型"""
         futures = {"Forge": forge_future, "Fabric": fabric_future, "NeoForge": neoforge_future}
-        while not all(f.done() for f in futures.values()):
+        pending = set(futures.values())
+        while pending:
             status_parts = []
             for name, f in futures.items():
                 icon = Utils.colorize("[✓]", AnsiColors.GREEN) if f.done() else Utils.colorize("[..]", AnsiColors.YELLOW)
                 status_parts.append(f"{icon} {name}")
             Utils.print_on_same_line("正在获取服务端信息: " + " ".join(status_parts))
-            time.sleep(0.1)
+            # 阻塞直到至少有一个请求完成，只在状态变化时重绘
+            _, pending = wait(pending, return_when=FIRST_COMPLETED)
         Utils.clear_line()
 
         availability = {
@@ -678,7 +1200,7 @@ class MinecraftManager:
         if not java_installations:
             raise IOError("未找到任何Java安装。请安装Java后重试。")
             
-        display_items = [str(inst) for inst in java_installations]
+        display_items = [inst.display for inst in java_installations]
         choice = Utils.show_menu(f"为 MC {mc_version} 选择 Java 版本", "请选择要使用的 Java 版本：", display_items)
         if choice == -1: return None
 
@@ -689,7 +1211,7 @@ class MinecraftManager:
         if save_default:
             server_dir.mkdir(parents=True, exist_ok=True)
             config = {"javaPath": str(selected_java.java_home)}
-            java_config_file.write_text(json.dumps(config, indent=2))
+            Utils.atomic_write_text(java_config_file, json.dumps(config, indent=2))
             Utils.print_color(f"已将 {selected_java.display_alias} 设置为此服务器的默认Java。", AnsiColors.GREEN)
 
         return java_path
@@ -703,71 +1225,186 @@ class MinecraftManager:
         mod_version_sanitized = mod_version.split('-')[-1] if mod_version and '-' in mod_version else mod_version
         return f"{mc_version}-{stype.name.lower()}-{mod_version_sanitized}"
 
-    def _install_server_core(self, stype: ServerType, mc_version: str, mod_version: Optional[str], server_dir: Path, java_path: str):
-        """核心安装逻辑"""
-        server_dir.mkdir(parents=True, exist_ok=True)
-        Utils.print_color(f"\n正在 {server_dir.resolve()} 中安装服务器...", AnsiColors.YELLOW)
-
+    def _get_download_url(self, stype: ServerType, mc_version: str, mod_version: Optional[str]) -> str:
+        """确定服务端 jar (Vanilla) 或安装程序的下载链接"""
         if stype == ServerType.VANILLA:
             url = ApiClients.get_minecraft_download_url(mc_version)
             if not url: raise IOError(f"获取 Vanilla {mc_version} 下载链接失败。")
-            target_jar = server_dir / f"{self._get_server_dir_name(stype, mc_version, None)}.jar"
-            self._download_file(url, target_jar)
-        
-        elif stype == ServerType.FABRIC:
+            return url
+        if stype == ServerType.FABRIC:
             url = ApiClients.get_fabric_installer_url()
             if not url: raise IOError("获取 Fabric 安装程序下载链接失败。")
-            installer_jar = server_dir / "fabric-installer.jar"
-            self._download_file(url, installer_jar)
+            return url
+        if stype == ServerType.FORGE:
+            return ApiClients.ForgeVersion(mod_version, mc_version, "").get_installer_url()
+        return ApiClients.NeoForgeVersion(mod_version, mc_version, "").get_installer_url()
+
+    def _get_download_filename(self, stype: ServerType, mc_version: str) -> str:
+        """下载文件在服务器目录中的文件名"""
+        if stype == ServerType.VANILLA:
+            return f"{self._get_server_dir_name(stype, mc_version, None)}.jar"
+        if stype == ServerType.FABRIC:
+            return "fabric-installer.jar"
+        return f"{stype.name.lower()}-installer.jar"
+
+    def _start_prefetch(self, stype: ServerType, mc_version: str, mod_version: Optional[str], server_dir_name: str) -> PendingDownload:
+        """在后台开始下载，下载到服务器目录旁的临时文件 (覆盖安装时目录会被删除)"""
+        url = self._get_download_url(stype, mc_version, mod_version)
+        self.MINECRAFT_SERVER_BASE_DIR.mkdir(parents=True, exist_ok=True)
+        staging_file = self.MINECRAFT_SERVER_BASE_DIR / f".{server_dir_name}.{self._get_download_filename(stype, mc_version)}.part"
+        cancel = threading.Event()
+        progress = DownloadProgress()
+        Utils.print_color(f"正在后台下载: {url}", AnsiColors.YELLOW)
+        # 下载线程不输出任何信息，等待下载时由 _install_server_core 根据 progress 绘制进度条
+        future = self.executor.submit(self._download_file, url, staging_file, cancel, progress)
+        return PendingDownload(url=url, staging_file=staging_file, future=future, cancel_event=cancel, progress=progress)
+
+    def _install_server_core(self, stype: ServerType, mc_version: str, mod_version: Optional[str], server_dir: Path, java_path: str, download: PendingDownload):
+        """核心安装逻辑"""
+        server_dir.mkdir(parents=True, exist_ok=True)
+        Utils.print_color(f"\n正在 {server_dir.resolve()} 中安装服务器...", AnsiColors.YELLOW)
+
+        try:
+            if not download.future.done():
+                Utils.print_color(f"正在等待后台下载完成: {download.url}", AnsiColors.YELLOW)
+                progress = download.progress
+                last_percent = -1
+                fallback_shown = False
+                while not wait([download.future], timeout=0.1).done:
+                    if progress.fallback_reason is not None and not fallback_shown:
+                        fallback_shown = True
+                        if last_percent >= 0:
+                            sys.stdout.write('\n')
+                        Utils.print_color(f"分段下载失败 ({progress.fallback_reason})，改用单连接重新下载。", AnsiColors.YELLOW)
+                        last_percent = -1
+                    last_percent = Utils.print_progress(progress.downloaded, progress.total, last_percent)
+                if last_percent >= 0:
+                    Utils.print_progress(progress.downloaded, progress.total, last_percent)
+                    sys.stdout.write('\n')
+            download.future.result()
+            downloaded_file = server_dir / self._get_download_filename(stype, mc_version)
+            os.replace(download.staging_file, downloaded_file)
+        except BaseException:
+            download.cancel()
+            raise
+        Utils.print_color(f"下载完成: {downloaded_file.resolve()}", AnsiColors.GREEN)
+
+        if stype == ServerType.FABRIC:
             Utils.print_color("正在运行 Fabric 安装程序...", AnsiColors.YELLOW)
-            cmd = [java_path, "-jar", installer_jar.name, "server", "-mcversion", mc_version, "-loader", mod_version, "-downloadMinecraft"]
+            cmd = [java_path, "-jar", downloaded_file.name, "server", "-mcversion", mc_version, "-loader", mod_version, "-downloadMinecraft"]
             self._run_process(cmd, server_dir)
-            installer_jar.unlink()
+            downloaded_file.unlink()
 
         elif stype in [ServerType.FORGE, ServerType.NEOFORGE]:
-            if stype == ServerType.FORGE:
-                version_obj = ApiClients.ForgeVersion(mod_version, mc_version, "")
-                url = version_obj.get_installer_url()
-            else: # NeoForge
-                version_obj = ApiClients.NeoForgeVersion(mod_version, mc_version, "")
-                url = version_obj.get_installer_url()
-            
-            installer_jar = server_dir / f"{stype.name.lower()}-installer.jar"
-            self._download_file(url, installer_jar)
             Utils.print_color(f"正在运行 {stype.name} 安装程序...", AnsiColors.YELLOW)
-            cmd = [java_path, "-jar", installer_jar.name, "--installServer"]
+            cmd = [java_path, "-jar", downloaded_file.name, "--installServer"]
             self._run_process(cmd, server_dir)
-            installer_jar.unlink()
+            downloaded_file.unlink()
+            # 预先解析启动参数，首次启动时无需再读取参数文件
+            self._get_forge_launch_args(server_dir)
 
-    def _download_file(self, url: str, target: Path):
-        """下载文件"""
-        Utils.print_color(f"正在下载: {url}", AnsiColors.YELLOW)
-        Utils.print_color(f"      到: {target.resolve()}", AnsiColors.YELLOW)
+    def _download_file(self, url: str, target: Path, cancel: threading.Event, progress: DownloadProgress):
+        """下载文件 (服务器支持 Range 时分段并行下载)；不输出任何信息，进度写入 progress，cancel 被设置时中止下载"""
         try:
-            with requests.get(url, stream=True, timeout=60) as r:
-                r.raise_for_status()
-                total_size = int(r.headers.get('content-length', 0))
-                downloaded = 0
-                with open(target, 'wb') as f:
-                    for chunk in r.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                        downloaded += len(chunk)
-                        if total_size > 0:
-                             done = int(50 * downloaded / total_size)
-                             percent = (downloaded / total_size) * 100
-                             sys.stdout.write(f"\r[{'=' * done}{' ' * (50-done)}] {percent:.2f}%")
-                             sys.stdout.flush()
-            sys.stdout.write('\n')
-            Utils.print_color("下载完成。", AnsiColors.GREEN)
-        except requests.RequestException as e:
+            final_url, total_size, ranges_supported = self._probe_download(url)
+            if ranges_supported and total_size >= self.PARALLEL_DOWNLOAD_MIN_SIZE:
+                try:
+                    self._download_ranges(final_url, target, total_size, cancel, progress)
+                except (*_network_errors(), OSError) as e:
+                    if cancel.is_set():
+                        raise
+                    progress.fallback_reason = str(e)
+                    self._download_single(url, target, cancel, progress)
+            else:
+                self._download_single(url, target, cancel, progress)
+        except _network_errors() as e:
             raise IOError(f"下载失败: {e}")
 
+    def _probe_download(self, url: str) -> Tuple[str, int, bool]:
+        """发送 HEAD 请求，返回 (重定向后的 URL, 文件大小, 是否支持分段下载)"""
+        try:
+            head = ApiClients._client().head(url, allow_redirects=True, timeout=15)
+        except _network_errors():
+            return url, 0, False
+        if not head.ok:
+            return url, 0, False
+        total_size = int(head.headers.get('content-length', 0))
+        ranges_supported = (
+            head.headers.get('accept-ranges', '').lower() == 'bytes'
+            and not head.headers.get('content-encoding')
+        )
+        return head.url, total_size, ranges_supported
+
+    def _download_single(self, url: str, target: Path, cancel: threading.Event, progress: DownloadProgress):
+        """单连接流式下载"""
+        with ApiClients._client().get(url, stream=True, timeout=60) as r:
+            r.raise_for_status()
+            progress.total = int(r.headers.get('content-length', 0))
+            progress.downloaded = 0
+            # 直接从底层连接读取 (按需解压)，跳过 iter_content 的生成器开销
+            r.raw.decode_content = True
+            with open(target, 'wb') as f:
+                read = r.raw.read
+                while chunk := read(self.DOWNLOAD_CHUNK_SIZE):
+                    if cancel.is_set():
+                        raise IOError("下载已取消")
+                    f.write(chunk)
+                    progress.downloaded += len(chunk)
+
+    def _download_ranges(self, url: str, target: Path, total_size: int, cancel: threading.Event, progress: DownloadProgress):
+        """将文件切分为多个字节范围，用多个连接并行下载并直接写入对应偏移"""
+        part_size = -(-total_size // self.DOWNLOAD_CONNECTIONS)
+        progress.total = total_size
+        progress.downloaded = 0
+        lock = threading.Lock()
+        abort = threading.Event()
+
+        fd = os.open(target, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, total_size)
+
+            def fetch_range(start: int, end: int):
+                # 分段下载要求按原始字节返回，禁止压缩
+                headers = {"Range": f"bytes={start}-{end}", "Accept-Encoding": "identity"}
+                with ApiClients._client().get(url, headers=headers, stream=True, timeout=60) as r:
+                    r.raise_for_status()
+                    if r.status_code != 206:
+                        raise IOError(f"服务器未返回分段内容 (HTTP {r.status_code})")
+                    offset = start
+                    for chunk in r.iter_content(chunk_size=self.DOWNLOAD_CHUNK_SIZE):
+                        if abort.is_set():
+                            return
+                        os.pwrite(fd, chunk, offset)
+                        offset += len(chunk)
+                        with lock:
+                            progress.downloaded += len(chunk)
+                if offset != end + 1:
+                    raise IOError(f"分段 {start}-{end} 数据不完整")
+
+            # 使用独立的线程池，避免与 self.executor 中的任务互相等待
+            with ThreadPoolExecutor(max_workers=self.DOWNLOAD_CONNECTIONS, thread_name_prefix="download") as pool:
+                futures = [
+                    pool.submit(fetch_range, start, min(start + part_size, total_size) - 1)
+                    for start in range(0, total_size, part_size)
+                ]
+                pending = set(futures)
+                # 超时只用于及时响应 cancel
+                while pending:
+                    done, pending = wait(pending, timeout=0.1)
+                    if any(f.exception() for f in done) or cancel.is_set():
+                        abort.set()
+                for f in futures:
+                    f.result()
+            if cancel.is_set():
+                raise IOError("下载已取消")
+        finally:
+            os.close(fd)
+
     def _run_process(self, command: List[str], work_dir: Path):
         """在工作目录中运行一个子进程并打印其输出"""
         try:
-            process = subprocess.Popen(command, cwd=work_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1, encoding='utf-8', errors='replace')
-            for line in iter(process.stdout.readline, ''):
-                print(line, end='')
+            process = subprocess.Popen(command, cwd=work_dir, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=0)
+            Utils.relay_output(process.stdout)
             process.wait()
             if process.returncode != 0:
                 raise IOError(f"安装子进程失败，退出码: {process.returncode}")
@@ -787,37 +1424,180 @@ class MinecraftManager:
                 pass
         
         Utils.print_color("正在创建并接受 EULA...", AnsiColors.YELLOW)
-        eula_file.parent.mkdir(exist_ok=True)
-        eula_file.write_text("eula=true\n")
+        Utils.atomic_write_text(eula_file, "eula=true\n")
         Utils.print_color("EULA 已接受。", AnsiColors.GREEN)
     
     def _infer_server_type(self, dir_name: str) -> ServerType:
         """从目录名推断服务器类型"""
-        name = dir_name.lower()
-        if "-forge-" in name: return ServerType.FORGE
-        if "-fabric-" in name: return ServerType.FABRIC
-        if "-neoforge-" in name: return ServerType.NEOFORGE
-        return ServerType.VANILLA
+        match = self._SERVER_TYPE_RE.search(dir_name)
+        return self._SERVER_TYPE_MAP[match.group(1).lower()] if match else ServerType.VANILLA
 
     def _infer_mc_version(self, dir_name: str) -> str:
         """从目录名推断 MC 版本"""
         return dir_name.split('-')[0]
 
+    def _relay_console(self, server_process: subprocess.Popen):
+        """用 selectors 转发服务器输出和用户输入，直到服务器关闭输出"""
+        out_fd = server_process.stdout.fileno()
+        out = sys.stdout.buffer
+        write_lock = threading.RLock()
+        stop_sent = False
+
+        def forward(commands: bytes):
+            with write_lock:
+                if stop_sent:
+                    return
+                try:
+                    server_process.stdin.write(commands)
+                    server_process.stdin.flush()
+                except (IOError, BrokenPipeError):
+                    # 服务器已关闭输入管道，继续读取剩余输出
+                    pass
+
+        def send_stop():
+            nonlocal stop_sent
+            with write_lock:
+                if stop_sent:
+                    return
+                stop_sent = True
+                Utils.print_color("\n检测到 CTRL+D/C，正在向服务器发送 'stop' 命令...", AnsiColors.YELLOW)
+                try:
+                    server_process.stdin.write(b'stop\n')
+                    server_process.stdin.flush()
+                except (IOError, BrokenPipeError):
+                    # 如果管道已关闭，则进程可能已终止
+                    pass
+
+        def read_stdin_lines():
+            # 非终端输入 (管道/文件)：之前的 input() 可能已把剩余行读入 sys.stdin 的缓冲区，
+            # 直接读取底层 fd 会丢失这些行，因此逐行读取 sys.stdin
+            encoding = sys.stdin.encoding or 'utf-8'
+            try:
+                for line in iter(sys.stdin.readline, ''):
+                    if line.strip():
+                        forward(line.encode(encoding))
+            except (OSError, ValueError):
+                pass
+            send_stop()
+
+        sys.stdout.flush()
+        with selectors.DefaultSelector() as sel:
+            sel.register(out_fd, selectors.EVENT_READ, "out")
+            in_fd: Optional[int] = None
+            if sys.stdin is not None and sys.stdin.isatty():
+                try:
+                    in_fd = sys.stdin.fileno()
+                    sel.register(in_fd, selectors.EVENT_READ, "in")
+                except (OSError, ValueError):
+                    # 无法监听的输入视为 EOF
+                    in_fd = None
+                    send_stop()
+            elif sys.stdin is not None:
+                threading.Thread(target=read_stdin_lines, name="mcm-stdin", daemon=True).start()
+            else:
+                send_stop()
+            while True:
+                try:
+                    events = sel.select(timeout=0.5)
+                    if not events and server_process.poll() is not None:
+                        return
+                    for key, _ in events:
+                        if key.data == "out":
+                            data = os.read(out_fd, 1 << 16)
+                            if not data:
+                                return
+                            out.write(data)
+                            out.flush()
+                        else:
+                            data = os.read(in_fd, 1 << 16)
+                            if not data: # CTRL+D
+                                sel.unregister(in_fd)
+                                send_stop()
+                                continue
+                            # 与逐行输入时一致：跳过空行
+                            commands = b"".join(l for l in data.splitlines(keepends=True) if l.strip())
+                            if commands:
+                                forward(commands)
+                except KeyboardInterrupt:
+                    # 第二次 CTRL+C 交由调用方强制结束进程
+                    if stop_sent:
+                        raise
+                    send_stop()
+
+    def _find_unix_args(self, server_dir: Path) -> Optional[Path]:
+        """查找 Forge/NeoForge 安装程序生成的 unix_args.txt"""
+        # 它位于 libraries/net/<组织>/<构件>/<版本>/ 下：先只扫描这几层，找不到再递归搜索 libraries
+        libraries_dir = server_dir / 'libraries'
+        net_dir = libraries_dir / 'net'
+
+        def subdirs(path: str) -> List[str]:
+            try:
+                with os.scandir(path) as it:
+                    return [entry.path for entry in it if entry.is_dir()]
+            except OSError:
+                return []
+
+        for org_dir in subdirs(str(net_dir)):
+            for artifact_dir in subdirs(org_dir):
+                for version_dir in subdirs(artifact_dir):
+                    candidate = os.path.join(version_dir, 'unix_args.txt')
+                    if os.path.isfile(candidate):
+                        return Path(candidate)
+
+        if not libraries_dir.is_dir():
+            return None
+        return next(libraries_dir.glob('**/unix_args.txt'), None)
+
+    def _get_forge_launch_args(self, server_dir: Path) -> Optional[List[str]]:
+        """获取 Forge/NeoForge 的启动参数 (不含 java 路径)；没有 unix_args.txt 时返回 None"""
+        # 参数文件解析结果缓存在 .mcm_cmd.json 中，user_jvm_args.txt 或 unix_args.txt 变化后重新生成
+        cache_file = server_dir / self.LAUNCH_CACHE_NAME
+        jvm_args_file = server_dir / 'user_jvm_args.txt'
+
+        def mtime_ns(path: Path) -> Optional[int]:
+            try:
+                return os.stat(path).st_mtime_ns
+            except OSError:
+                return None
+
+        try:
+            cache = json.loads(cache_file.read_text(encoding='utf-8'))
+            if (cache["jvm_args_mtime"] == mtime_ns(jvm_args_file)
+                    and cache["args_file_mtime"] == mtime_ns(server_dir / cache["args_file"])):
+                return cache["args"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+        # 检查特征文件 unix_args.txt
+        args_file = self._find_unix_args(server_dir)
+        if not args_file:
+            return None
+        # 读取 user_jvm_args.txt 中的 JVM 参数
+        jvm_args = jvm_args_file.read_text().strip() if jvm_args_file.exists() else ''
+        # 组合命令
+        main_args = args_file.read_text().strip().replace('@user_jvm_args.txt', jvm_args)
+        launch_args = shlex.split(main_args)
+
+        cache = {
+            "args": launch_args,
+            "args_file": str(args_file.relative_to(server_dir)),
+            "args_file_mtime": mtime_ns(args_file),
+            "jvm_args_mtime": mtime_ns(jvm_args_file),
+        }
+        try:
+            Utils.atomic_write_text(cache_file, json.dumps(cache, indent=2))
+        except OSError:
+            pass
+        return launch_args
+
     def _start_server(self, stype: ServerType, java_path: str, server_dir: Path):
         """启动 Minecraft 服务器"""
         command: List[str] = []
         if stype in [ServerType.FORGE, ServerType.NEOFORGE]:
             # 现代 Forge/NeoForge (>=1.17) 使用 @-prefixed argument files
-            # 检查特征文件 unix_args.txt
-            args_files = list(server_dir.glob('**/unix_args.txt'))
-            if args_files:
-                args_file = args_files[0]
-                # 读取 user_jvm_args.txt 中的 JVM 参数
-                jvm_args_file = server_dir / 'user_jvm_args.txt'
-                jvm_args = jvm_args_file.read_text().strip() if jvm_args_file.exists() else ''
-                # 组合命令
-                main_args = args_file.read_text().strip().replace('@user_jvm_args.txt', jvm_args)
-                command = [java_path] + shlex.split(main_args)
+            launch_args = self._get_forge_launch_args(server_dir)
+            if launch_args is not None:
+                command = [java_path] + launch_args
             else: # 旧版 Forge/NeoForge 使用 run.sh
                 run_script = server_dir / "run.sh"
                 if not run_script.exists():
@@ -846,38 +1626,18 @@ class MinecraftManager:
                 stdin=subprocess.PIPE,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-                encoding='utf-8',
-                errors='replace'
+                bufsize=0
             )
 
-            # 线程：读取并打印服务器输出
-            def read_output(proc):
-                for line in iter(proc.stdout.readline, ''):
-                    sys.stdout.write(line)
-                    sys.stdout.flush()
-
-            output_thread = threading.Thread(target=read_output, args=(server_process,))
-            output_thread.daemon = True
-            output_thread.start()
-            
-            # 主线程处理用户输入
-            while server_process.poll() is None:
-                try:
-                    user_input = input()
-                    if user_input.strip():
-                        server_process.stdin.write(user_input + '\n')
-                        server_process.stdin.flush()
-                except (EOFError, KeyboardInterrupt):
-                    Utils.print_color("\n检测到 CTRL+D/C，正在向服务器发送 'stop' 命令...", AnsiColors.YELLOW)
-                    try:
-                        server_process.stdin.write('stop\n')
-                        server_process.stdin.flush()
-                    except (IOError, BrokenPipeError):
-                        # 如果管道已关闭，则进程可能已终止
-                        pass
-                    break
+            # 单线程同时处理服务器输出与用户输入
+            try:
+                self._relay_console(server_process)
+            except Exception:
+                # 转发意外中断时结束服务器，避免留下无人读取输出的孤儿进程
+                if server_process.poll() is None:
+                    server_process.kill()
+                    server_process.wait()
+                raise
 
             # 等待进程终止
             server_process.wait(timeout=60)